@@ -0,0 +1,117 @@
+"""
+Read date/currency partitioned output written with CONFIG["output_partitioning"].
+
+Partitions are pruned from _manifest.csv alone (date range overlap and currency),
+so only the matching partition files are opened.
+
+Usage:
+    python partitioned_reader.py bank_statement --start 2026-10-01 --end 2026-10-07
+        --currency EUR --currency USD
+"""
+
+import os
+import argparse
+
+try:
+    import pandas as pd
+except ImportError:
+    raise SystemExit("Please install pandas: pip install pandas")
+
+
+# ==========================
+# CONFIGURATION
+# ==========================
+
+CONFIG = {
+    "partitioned_root": os.path.join("data", "output", "partitioned"),
+}
+
+
+# ==========================
+# MANIFEST AND PRUNING
+# ==========================
+
+def load_manifest(root=None):
+    root = root or CONFIG["partitioned_root"]
+    return pd.read_csv(
+        os.path.join(root, "_manifest.csv"),
+        dtype={"partition_value": str, "currency": str, "path": str},
+    )
+
+
+def prune_partitions(manifest, table, start_date=None, end_date=None, currencies=None):
+    """
+    Keep partitions of `table` whose [date_min, date_max] overlaps the requested
+    range and whose currency is requested. Dates are inclusive YYYY-MM-DD strings.
+    """
+    parts = manifest[manifest["table"] == table]
+    if start_date:
+        parts = parts[parts["date_max"] >= start_date]
+    if end_date:
+        parts = parts[parts["date_min"] <= end_date]
+    if currencies:
+        parts = parts[parts["currency"].isin(currencies)]
+    return parts
+
+
+def read_partitioned(table, start_date=None, end_date=None, currencies=None, root=None):
+    """
+    Read only the pruned partitions of a table.
+    - Partition columns (month key, currency) are restored from the manifest when
+      the files do not carry them.
+    - Rows are then filtered exactly on the table's date column.
+    """
+    root = root or CONFIG["partitioned_root"]
+    parts = prune_partitions(load_manifest(root), table, start_date, end_date, currencies)
+
+    frames = []
+    for part in parts.itertuples(index=False):
+        df = pd.read_csv(os.path.join(root, part.path))
+        if part.partition_key not in df.columns:
+            df[part.partition_key] = part.partition_value
+        if "currency" not in df.columns:
+            df["currency"] = part.currency
+        frames.append(df)
+
+    if not frames:
+        return pd.DataFrame()
+    df = pd.concat(frames, ignore_index=True)
+
+    date_col = parts["date_column"].iloc[0]
+    if start_date:
+        df = df[df[date_col] >= start_date]
+    if end_date:
+        df = df[df[date_col] <= end_date]
+    return df.reset_index(drop=True)
+
+
+# ==========================
+# MAIN
+# ==========================
+
+def main():
+    parser = argparse.ArgumentParser(description="Read partitioned output with pruning.")
+    parser.add_argument("table", help="e.g. bank_statement, invoices_header, ground_truth_links")
+    parser.add_argument("--start", default=None, help="inclusive start date YYYY-MM-DD")
+    parser.add_argument("--end", default=None, help="inclusive end date YYYY-MM-DD")
+    parser.add_argument("--currency", action="append", default=None)
+    parser.add_argument("--root", default=CONFIG["partitioned_root"])
+    parser.add_argument("--out", default=None, help="write the selected rows to this CSV")
+    args = parser.parse_args()
+
+    manifest = load_manifest(args.root)
+    parts = prune_partitions(manifest, args.table, args.start, args.end, args.currency)
+    n_total = (manifest["table"] == args.table).sum()
+    print(
+        f"{len(parts)} of {n_total} partitions selected "
+        f"({parts['rows'].sum()} rows before row filter)"
+    )
+
+    df = read_partitioned(args.table, args.start, args.end, args.currency, args.root)
+    print(f"{len(df)} rows read")
+    if args.out:
+        df.to_csv(args.out, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,471 @@
+"""
+Score predicted reconciliation links against ground_truth_links.csv.
+
+Predicted files have doc_id and bank_txn_id columns (csv, .gz or .zst):
+- doc_id + bank_txn_id   -> the doc is matched to that bank transaction
+- doc_id, no bank_txn_id -> the doc is predicted missing in bank
+- bank_txn_id, no doc_id -> the bank transaction is predicted bank-only noise
+
+Usage:
+    python score_reconciliation.py predicted.csv [more_chunks.csv ...]
+        [--truth ground_truth_links.csv.gz] [--bank bank_statement.csv.gz]
+
+Truth and bank default to the generator output under data/output. Without a
+bank statement, bank-only predictions are skipped with a warning.
+Installing pyarrow enables the fast CSV reader and buffer-level id hashing.
+"""
+
+import os
+import argparse
+
+try:
+    import pandas as pd
+    import numpy as np
+except ImportError:
+    raise SystemExit("Please install pandas and numpy: pip install pandas numpy")
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.compute as pa_compute
+except ImportError:
+    pa = None  # optional: multi-threaded CSV parsing and buffer-level id hashing
+
+
+# ==========================
+# CONFIGURATION
+# ==========================
+
+CONFIG = {
+    "truth_path": os.path.join("data", "output", "reconciliation", "ground_truth_links.csv"),
+    "bank_path": os.path.join("data", "output", "bank", "bank_statement.csv"),
+    "chunk_rows": 5_000_000,       # rows per predicted chunk (pandas reader)
+    "chunk_bytes": 256 << 20,      # bytes per predicted chunk (pyarrow reader)
+    "max_error_rows": 100_000,     # cap on false positives kept for the error report
+}
+
+LINK_TYPES = [
+    "exact",
+    "partial_or_mismatch",
+    "multi_to_one",
+    "one_to_multi",
+    "missing_in_bank",
+    "bank_only",
+    "unknown",
+]
+BANK_ONLY = LINK_TYPES.index("bank_only")
+UNKNOWN = LINK_TYPES.index("unknown")
+
+HASH_PRIME = np.uint64(0x9E3779B97F4A7C15)
+
+
+# ==========================
+# READERS
+# ==========================
+
+def find_output_file(path):
+    """
+    Resolve a generator output path written plain, gzip or zstd; None if absent.
+    When copies under several codecs exist, the most recently written one wins.
+    """
+    candidates = [path + suffix for suffix in ["", ".gz", ".zst"] if os.path.exists(path + suffix)]
+    if not candidates:
+        return None
+    return max(candidates, key=os.path.getmtime)
+
+
+def arrow_string_options(columns, block_size=None):
+    read_options = pa_csv.ReadOptions(block_size=block_size) if block_size else None
+    convert_options = pa_csv.ConvertOptions(
+        include_columns=columns,
+        column_types={c: pa.string() for c in columns},
+        strings_can_be_null=False,
+    )
+    return read_options, convert_options
+
+
+def read_columns(path, columns):
+    """
+    Read only `columns` as strings with '' for missing values.
+    Returns a pyarrow Table when pyarrow is installed, else a DataFrame;
+    table[column] works the same way for both below.
+    """
+    if pa is not None:
+        read_options, convert_options = arrow_string_options(columns)
+        return pa_csv.read_csv(path, read_options=read_options, convert_options=convert_options)
+    return pd.read_csv(path, usecols=columns, dtype=object, keep_default_na=False)
+
+
+def iter_link_chunks(path, chunk_rows=None):
+    """Stream doc_id/bank_txn_id from a predicted-links file in chunks."""
+    columns = ["doc_id", "bank_txn_id"]
+    if pa is not None:
+        read_options, convert_options = arrow_string_options(columns, CONFIG["chunk_bytes"])
+        reader = pa_csv.open_csv(path, read_options=read_options, convert_options=convert_options)
+        for batch in reader:
+            yield pa.Table.from_batches([batch])
+        return
+    yield from pd.read_csv(
+        path,
+        usecols=columns,
+        dtype=object,
+        keep_default_na=False,
+        chunksize=chunk_rows or CONFIG["chunk_rows"],
+    )
+
+
+def take_ids(values, idx):
+    """values[idx] as a numpy object array, for Arrow columns or numpy/pandas."""
+    if pa is not None and isinstance(values, (pa.Array, pa.ChunkedArray)):
+        return values.take(pa.array(idx, type=pa.int64())).to_numpy(zero_copy_only=False)
+    return np.asarray(values, dtype=object)[idx]
+
+
+def take_link_rows(chunk, idx):
+    return pd.DataFrame(
+        {
+            "doc_id": take_ids(chunk["doc_id"], idx),
+            "bank_txn_id": take_ids(chunk["bank_txn_id"], idx),
+        }
+    )
+
+
+# ==========================
+# HASHING
+# ==========================
+
+def hash_arrow_strings(arr):
+    """
+    Vectorized uint64 hash straight from an Arrow string array's offset/data
+    buffers, 8 bytes at a time, without creating Python str objects.
+    Rows only mix the words they actually have, so an id hashes the same way
+    whatever other ids share its array.
+    """
+    n = len(arr)
+    if n == 0:
+        return np.zeros(0, dtype=np.uint64)
+    offset_type = np.int64 if pa.types.is_large_string(arr.type) else np.int32
+    buffers = arr.buffers()
+    offsets = np.frombuffer(buffers[1], dtype=offset_type)[arr.offset : arr.offset + n + 1]
+    offsets = offsets.astype(np.int64)
+    data = np.frombuffer(buffers[2], dtype=np.uint8) if buffers[2] is not None else np.zeros(0)
+    padded = np.zeros(len(data) + 8, dtype=np.uint8)
+    padded[: len(data)] = data
+    # Unaligned little-endian uint64 view starting at every byte position
+    words = np.ndarray(shape=(len(data) + 1,), dtype="<u8", buffer=padded, strides=(1,))
+
+    starts = offsets[:-1]
+    lengths = offsets[1:] - starts
+    hashes = lengths.astype(np.uint64) * HASH_PRIME
+    for pos in range(0, int(lengths.max()), 8):
+        remaining = np.minimum(np.maximum(lengths - pos, 0), 8).astype(np.uint64)
+        mask = np.where(
+            remaining >= 8,
+            np.uint64(0xFFFFFFFFFFFFFFFF),
+            (np.uint64(1) << (np.minimum(remaining, 7) * np.uint64(8))) - np.uint64(1),
+        )
+        word = words[np.minimum(starts + pos, len(data))] & mask
+        mixed = (hashes ^ word) * HASH_PRIME
+        mixed ^= mixed >> np.uint64(29)
+        hashes = np.where(remaining > 0, mixed, hashes)
+    hashes ^= hashes >> np.uint64(32)
+    hashes[lengths == 0] = 0
+    return hashes
+
+
+def hash_ids(values):
+    """Vectorized uint64 hash per id; '' (missing id) hashes to 0."""
+    if pa is not None and isinstance(values, pa.ChunkedArray):
+        if values.num_chunks == 0:
+            return np.zeros(0, dtype=np.uint64)
+        return np.concatenate([hash_arrow_strings(c) for c in values.chunks])
+    if pa is not None and isinstance(values, pa.Array):
+        return hash_arrow_strings(values)
+    values = np.asarray(values, dtype=object)
+    hashes = pd.util.hash_array(values, categorize=False)
+    hashes[values == ""] = 0
+    return hashes
+
+
+def check_hash_consistency():
+    """
+    Guard for the id hash: an id must hash the same alone, next to longer ids and
+    across Arrow chunks, and '' must hash to 0. Raises RuntimeError otherwise.
+    """
+    ids = ["INV-0000001", "", "SOME-VERY-LONG-DOC-IDENTIFIER-0000001", "BNK-1"]
+    alone = np.concatenate([hash_ids([i]) if pa is None else hash_ids(pa.array([i])) for i in ids])
+    together = hash_ids(ids if pa is None else pa.array(ids))
+    if pa is not None:
+        chunked = hash_ids(pa.chunked_array([ids[:1], ids[1:]]))
+        if not np.array_equal(alone, chunked):
+            raise RuntimeError("id hashes differ across Arrow chunks")
+    if not np.array_equal(alone, together) or alone[1] != 0:
+        raise RuntimeError("id hashes depend on neighbouring ids")
+
+
+def link_type_codes(values):
+    """Index into LINK_TYPES per row; unrecognized labels map to 'unknown'."""
+    if pa is not None and isinstance(values, pa.ChunkedArray):
+        codes = pa_compute.index_in(values, value_set=pa.array(LINK_TYPES))
+        return pa_compute.fill_null(codes, UNKNOWN).to_numpy().astype(np.intp)
+    codes = pd.Categorical(values, categories=LINK_TYPES).codes.astype(np.intp)
+    codes[codes < 0] = UNKNOWN
+    return codes
+
+
+def pair_keys(doc_hashes, bank_hashes):
+    """Combine doc and bank hashes into one uint64 join key (wraps mod 2**64)."""
+    return doc_hashes * HASH_PRIME ^ bank_hashes
+
+
+def first_occurrences(keys):
+    """Row positions of the first occurrence of each key (hash-based, no sort)."""
+    return np.flatnonzero(~pd.Series(keys).duplicated().to_numpy())
+
+
+def find_keys(key_index, query):
+    """Positions of query keys in a unique uint64 key index and a mask of which were found."""
+    pos = key_index.get_indexer(query)
+    found = pos >= 0
+    return np.where(found, pos, 0), found
+
+
+def id_type_lookup(hashes, type_codes):
+    """Hash index of ids with the link type of each id (first occurrence wins)."""
+    present = np.flatnonzero(hashes != 0)
+    first = present[first_occurrences(hashes[present])]
+    return pd.Index(hashes[first]), type_codes[first]
+
+
+# ==========================
+# GROUND TRUTH INDEX
+# ==========================
+
+def build_truth_index(truth_path, bank_path=None):
+    """
+    Encode the ground truth as a hash index of uint64 pair keys:
+    - doc and bank ids are hashed, so joins are integer hash lookups, not string dicts.
+    - Bank transactions with no link (from bank_path) become ('', bank) bank_only pairs.
+    - 64-bit hashes make collisions negligible at tens of millions of links.
+    """
+    truth = read_columns(truth_path, ["doc_id", "bank_txn_id", "link_type"])
+    type_codes = link_type_codes(truth["link_type"])
+    doc_hashes = hash_ids(truth["doc_id"])
+    bank_hashes = hash_ids(truth["bank_txn_id"])
+    n_links = len(type_codes)
+
+    # Ids for the error report are only materialized for misses
+    id_sources = [(truth["doc_id"], truth["bank_txn_id"])]
+
+    if bank_path is not None:
+        bank_col = read_columns(bank_path, ["bank_txn_id"])["bank_txn_id"]
+        all_bank = hash_ids(bank_col)
+        unlinked = (all_bank != 0) & ~np.isin(all_bank, bank_hashes)
+        only_rows = np.flatnonzero(unlinked)
+        only_rows = only_rows[first_occurrences(all_bank[only_rows])]
+        only_hashes = all_bank[only_rows]
+        id_sources.append((None, take_ids(bank_col, only_rows)))
+        doc_hashes = np.concatenate([doc_hashes, np.zeros(len(only_hashes), dtype=np.uint64)])
+        bank_hashes = np.concatenate([bank_hashes, only_hashes])
+        type_codes = np.concatenate([type_codes, np.full(len(only_hashes), BANK_ONLY)])
+
+    # Unique keys (drops duplicate truth rows)
+    keys = pair_keys(doc_hashes, bank_hashes)
+    order = first_occurrences(keys)
+
+    # Per-id link type, used to attribute false positives to a category
+    doc_keys, doc_types = id_type_lookup(doc_hashes, type_codes)
+    bank_keys, bank_types = id_type_lookup(bank_hashes, type_codes)
+
+    return {
+        "keys": pd.Index(keys[order]),
+        "types": type_codes[order],
+        "rows": order,
+        "n_links": n_links,
+        "id_sources": id_sources,
+        "has_bank": bank_path is not None,
+        "doc_keys": doc_keys,
+        "doc_types": doc_types,
+        "bank_keys": bank_keys,
+        "bank_types": bank_types,
+    }
+
+
+def truth_ids(truth_index, rows):
+    """doc_id/bank_txn_id of truth rows (links first, then bank-only txns)."""
+    is_link = rows < truth_index["n_links"]
+    doc_src, bank_src = truth_index["id_sources"][0]
+    doc_ids = np.full(len(rows), "", dtype=object)
+    bank_ids = np.full(len(rows), "", dtype=object)
+    doc_ids[is_link] = take_ids(doc_src, rows[is_link])
+    bank_ids[is_link] = take_ids(bank_src, rows[is_link])
+    if len(truth_index["id_sources"]) > 1:
+        bank_only_ids = truth_index["id_sources"][1][1]
+        bank_ids[~is_link] = bank_only_ids[rows[~is_link] - truth_index["n_links"]]
+    return doc_ids, bank_ids
+
+
+# ==========================
+# SCORING
+# ==========================
+
+def new_score_state(truth_index):
+    return {
+        "hit": np.zeros(len(truth_index["keys"]), dtype=bool),
+        "fp": np.zeros(len(LINK_TYPES), dtype=np.int64),
+        "fp_seen": pd.Index(np.zeros(0, dtype=np.uint64)),
+        "fp_rows": [],
+        "fp_kept": 0,
+        "skipped_bank_only": 0,
+    }
+
+
+def score_chunk(truth_index, state, chunk):
+    """
+    Fold one chunk of predictions into the running state.
+    Every distinct predicted pair counts once, whatever the chunking:
+    true positives via the per-truth-row hit mask, false positives via fp_seen.
+    """
+    doc_hashes = hash_ids(chunk["doc_id"])
+    bank_hashes = hash_ids(chunk["bank_txn_id"])
+    keys = pair_keys(doc_hashes, bank_hashes)
+
+    keep = (doc_hashes != 0) | (bank_hashes != 0)
+    if not truth_index["has_bank"]:
+        # Bank-only predictions cannot be judged without the bank statement
+        bank_only = (doc_hashes == 0) & (bank_hashes != 0)
+        state["skipped_bank_only"] += int(bank_only.sum())
+        keep &= ~bank_only
+    # Drop repeated pairs within the chunk (int keys, cheaper than string dedupe)
+    keep &= ~pd.Series(keys).duplicated().to_numpy()
+    rows = np.flatnonzero(keep)
+    doc_hashes, bank_hashes, keys = doc_hashes[rows], bank_hashes[rows], keys[rows]
+
+    pos, matched = find_keys(truth_index["keys"], keys)
+    state["hit"][pos[matched]] = True
+
+    # False positives not already counted in an earlier chunk
+    _, seen = find_keys(state["fp_seen"], keys)
+    fp_mask = ~matched & ~seen
+    if fp_mask.any():
+        state["fp_seen"] = pd.Index(np.concatenate([state["fp_seen"].to_numpy(), keys[fp_mask]]))
+
+    # Category of the predicted doc, else of the bank txn
+    fp_type = np.full(fp_mask.sum(), UNKNOWN)
+    doc_pos, doc_found = find_keys(truth_index["doc_keys"], doc_hashes[fp_mask])
+    fp_type[doc_found] = truth_index["doc_types"][doc_pos[doc_found]]
+    bank_pos, bank_found = find_keys(truth_index["bank_keys"], bank_hashes[fp_mask])
+    use_bank = ~doc_found & bank_found
+    fp_type[use_bank] = truth_index["bank_types"][bank_pos[use_bank]]
+    state["fp"] += np.bincount(fp_type, minlength=len(LINK_TYPES))
+
+    room = CONFIG["max_error_rows"] - state["fp_kept"]
+    if room > 0 and len(fp_type):
+        fp_rows = take_link_rows(chunk, rows[fp_mask][:room])
+        fp_rows["link_type"] = np.array(LINK_TYPES)[fp_type[:room]]
+        state["fp_rows"].append(fp_rows)
+        state["fp_kept"] += len(fp_rows)
+
+
+def summarize(truth_index, state):
+    """Precision/recall/F1 per link_type plus an overall row."""
+    types = truth_index["types"]
+    hit = state["hit"]
+    tp = np.bincount(types[hit], minlength=len(LINK_TYPES))
+    fn = np.bincount(types[~hit], minlength=len(LINK_TYPES))
+    fp = state["fp"]
+
+    metrics = pd.DataFrame({"link_type": LINK_TYPES, "tp": tp, "fp": fp, "fn": fn})
+    metrics = metrics[(metrics[["tp", "fp", "fn"]].sum(axis=1)) > 0]
+    overall = pd.DataFrame(
+        [{"link_type": "overall", "tp": tp.sum(), "fp": fp.sum(), "fn": fn.sum()}]
+    )
+    metrics = pd.concat([metrics, overall], ignore_index=True)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = metrics["tp"] / (metrics["tp"] + metrics["fp"])
+        recall = metrics["tp"] / (metrics["tp"] + metrics["fn"])
+        f1 = 2 * precision * recall / (precision + recall)
+    metrics["precision"] = precision.fillna(0.0).round(4)
+    metrics["recall"] = recall.fillna(0.0).round(4)
+    metrics["f1"] = f1.fillna(0.0).round(4)
+    return metrics
+
+
+def error_cases(truth_index, state):
+    """False positives (capped at max_error_rows) and all false negatives."""
+    miss = ~state["hit"]
+    doc_ids, bank_ids = truth_ids(truth_index, truth_index["rows"][miss])
+    fn_rows = pd.DataFrame(
+        {
+            "doc_id": doc_ids,
+            "bank_txn_id": bank_ids,
+            "link_type": np.array(LINK_TYPES)[truth_index["types"][miss]],
+        }
+    )
+    fn_rows.insert(0, "error", "false_negative")
+    frames = [fn_rows]
+    if state["fp_rows"]:
+        fp_rows = pd.concat(state["fp_rows"], ignore_index=True)
+        fp_rows.insert(0, "error", "false_positive")
+        frames.insert(0, fp_rows)
+    return pd.concat(frames, ignore_index=True)
+
+
+def score_files(pred_paths, truth_path, bank_path=None, chunk_rows=None):
+    """Score one or more predicted-link files, each streamed in chunks."""
+    check_hash_consistency()
+    truth_index = build_truth_index(truth_path, bank_path)
+    state = new_score_state(truth_index)
+    for path in pred_paths:
+        for chunk in iter_link_chunks(path, chunk_rows):
+            score_chunk(truth_index, state, chunk)
+    if state["skipped_bank_only"]:
+        print(
+            f"WARNING: skipped {state['skipped_bank_only']} bank-only predictions; "
+            "pass --bank to score bank-only noise."
+        )
+    return summarize(truth_index, state), error_cases(truth_index, state)
+
+
+# ==========================
+# MAIN
+# ==========================
+
+def main():
+    parser = argparse.ArgumentParser(description="Score predicted links against ground truth.")
+    parser.add_argument("predicted", nargs="+", help="predicted link file(s) or chunks")
+    parser.add_argument("--truth", default=None, help=f"default: {CONFIG['truth_path']}[.gz|.zst]")
+    parser.add_argument(
+        "--bank",
+        default=None,
+        help=f"bank statement for scoring bank-only noise (default: {CONFIG['bank_path']}"
+        "[.gz|.zst] when present)",
+    )
+    parser.add_argument(
+        "--chunk-rows",
+        type=int,
+        default=CONFIG["chunk_rows"],
+        help="rows per chunk when pyarrow is not installed",
+    )
+    parser.add_argument("--metrics-out", default=None, help="write metrics CSV here")
+    parser.add_argument("--errors-out", default=None, help="write error cases CSV here")
+    args = parser.parse_args()
+
+    truth_path = args.truth or find_output_file(CONFIG["truth_path"])
+    if truth_path is None:
+        raise SystemExit(f"Ground truth not found: {CONFIG['truth_path']}[.gz|.zst]")
+    bank_path = args.bank or find_output_file(CONFIG["bank_path"])
+
+    metrics, errors = score_files(args.predicted, truth_path, bank_path, args.chunk_rows)
+
+    print(metrics.to_string(index=False))
+    print(f"\n{len(errors)} error cases")
+    if args.metrics_out:
+        metrics.to_csv(args.metrics_out, index=False)
+    if args.errors_out:
+        errors.to_csv(args.errors_out, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,13 @@
 import os
+import gzip
+import shutil
 import json
 import random
 import string
 import math
 from datetime import datetime, timedelta
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
 try:
     from faker import Faker
@@ -17,6 +20,11 @@ try:
 except ImportError:
     raise SystemExit("Please install pandas and numpy: pip install pandas numpy")
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None  # only needed for output_compression="zstd"
+
 
 # ==========================
 # CONFIGURATION
@@ -41,6 +49,22 @@ CONFIG = {
     "ocr_noise_rate": 0.15,        # probability field gets OCR noise
     "ocr_dropout_rate": 0.05,      # probability field is dropped
     "ocr_typo_rate": 0.20,         # probability of typos in strings
+    "reporting_currency": "USD",   # normalized amounts are expressed in this currency
+    "fx_usd_rates": {              # starting USD value of one unit of each currency
+        "USD": 1.0,
+        "EUR": 1.08,
+        "GBP": 1.27,
+        "AED": 0.2723,             # pegged
+    },
+    "fx_daily_volatility": 0.004,  # std dev of daily log returns for floating currencies
+    "fx_pegged_currencies": ["USD", "AED"],
+    "fx_horizon_days": 60,         # rates extend this far past today (latest payment dates)
+    "cross_currency_settlement_rate": 0.0,  # probability a doc is paid in another currency
+    "output_compression": "gzip",  # "gzip", "zstd" or None for plain CSV
+    "output_compression_level": 6, # gzip: 1-9, zstd: 1-22
+    "output_writer_threads": 4,    # background writers, overlap with generation
+    "output_chunk_rows": 50000,    # rows per to_csv chunk when streaming
+    "output_partitioning": None,   # None (flat files), "day" or "month" Hive-style partitions
 }
 
 
@@ -57,6 +81,7 @@ def ensure_dirs(root):
     subdirs = [
         "output/invoices/ocr_noise",
         "output/bank",
+        "output/fx",
         "output/reconciliation",
         "output/metadata",
     ]
@@ -111,6 +136,103 @@ def amount_with_small_noise(amount, max_pct=0.1):
     return round(amount + delta, 2)
 
 
+# ==========================
+# FX RATES
+# ==========================
+
+def generate_fx_table(currencies, start_date, n_days):
+    """
+    Daily FX table as a dense array:
+    - rates[day_offset, currency_idx] = reporting-currency value of one unit.
+    - day_offset counts days from start_date, so lookups are plain array indexing.
+    - Floating currencies follow a geometric random walk against USD.
+    Uses its own RNG so adding FX does not shift the main random streams.
+    """
+    rng = np.random.default_rng(CONFIG["seed"])
+    currencies = list(currencies)
+    usd_rates = np.array([CONFIG["fx_usd_rates"][c] for c in currencies], dtype=float)
+
+    log_returns = rng.normal(0.0, CONFIG["fx_daily_volatility"], size=(n_days, len(currencies)))
+    log_returns[0, :] = 0.0
+    for idx, ccy in enumerate(currencies):
+        if ccy in CONFIG["fx_pegged_currencies"]:
+            log_returns[:, idx] = 0.0
+    usd_per_unit = usd_rates * np.exp(np.cumsum(log_returns, axis=0))
+
+    reporting_idx = currencies.index(CONFIG["reporting_currency"])
+    rates = usd_per_unit / usd_per_unit[:, [reporting_idx]]
+
+    return {
+        "start_date": start_date,
+        "currencies": currencies,
+        "currency_index": {c: i for i, c in enumerate(currencies)},
+        "rates": np.round(rates, 6),
+    }
+
+
+def fx_day_offsets(fx_table, dates):
+    """Vectorized date -> row index into fx_table["rates"] (clipped to the table range)."""
+    dates = pd.to_datetime(pd.Series(dates)).dt.normalize()
+    start = pd.Timestamp(fx_table["start_date"])
+    offsets = ((dates - start).dt.days).to_numpy()
+    return np.clip(offsets, 0, len(fx_table["rates"]) - 1)
+
+
+def fx_currency_indices(fx_table, currencies):
+    """Vectorized currency code -> column index into fx_table["rates"]."""
+    idx = pd.Index(fx_table["currencies"]).get_indexer(pd.Series(currencies))
+    if (idx < 0).any():
+        unknown = sorted(set(pd.Series(currencies)[idx < 0].astype(str)))
+        raise ValueError(f"Currencies missing from FX table: {unknown}")
+    return idx
+
+
+def convert_amounts(fx_table, amounts, from_currencies, dates, to_currency=None):
+    """
+    Convert whole columns at once:
+    amount * rate[day, from] / rate[day, to], all via array indexing.
+    """
+    to_currency = to_currency or CONFIG["reporting_currency"]
+    rates = fx_table["rates"]
+    day_idx = fx_day_offsets(fx_table, dates)
+    from_idx = fx_currency_indices(fx_table, from_currencies)
+    to_idx = fx_table["currency_index"][to_currency]
+    amounts = np.asarray(amounts, dtype=float)
+    return np.round(amounts * rates[day_idx, from_idx] / rates[day_idx, to_idx], 2)
+
+
+def fx_convert(fx_table, amount, from_currency, to_currency, date):
+    """Single-amount conversion used while generating bank transactions."""
+    if from_currency == to_currency:
+        return amount
+    day = min(max((date.date() - fx_table["start_date"]).days, 0), len(fx_table["rates"]) - 1)
+    rates = fx_table["rates"][day]
+    idx = fx_table["currency_index"]
+    return round(amount * rates[idx[from_currency]] / rates[idx[to_currency]], 2)
+
+
+def normalize_to_reporting(df, amount_col, currency_col, date_col, fx_table):
+    """Add <amount_col>_reporting with the amount expressed in the reporting currency."""
+    df[f"{amount_col}_reporting"] = convert_amounts(
+        fx_table, df[amount_col], df[currency_col], df[date_col]
+    )
+    return df
+
+
+def fx_table_to_df(fx_table):
+    """Long-format FX table for CSV output."""
+    n_days, n_ccy = fx_table["rates"].shape
+    dates = pd.date_range(fx_table["start_date"], periods=n_days, freq="D")
+    return pd.DataFrame(
+        {
+            "rate_date": np.repeat(dates.strftime("%Y-%m-%d"), n_ccy),
+            "currency": np.tile(fx_table["currencies"], n_days),
+            "reporting_currency": CONFIG["reporting_currency"],
+            "rate_to_reporting": fx_table["rates"].ravel(),
+        }
+    )
+
+
 # ==========================
 # MASTER DATA
 # ==========================
@@ -231,10 +353,12 @@ def generate_docs(doc_type, n_docs, vendors, customers):
 # BANK TRANSACTIONS
 # ==========================
 
-def generate_bank_transactions_from_docs(doc_headers):
+def generate_bank_transactions_from_docs(doc_headers, fx_table=None):
     """
     Start with doc totals and create different match patterns
     (exact matches, partial payments, multi-to-one, one-to-multi, missing).
+    With an fx_table, docs may be settled in another currency
+    (cross_currency_settlement_rate) and amounts are converted at the payment date.
     """
     bank_txns = []
     reconc_links = []
@@ -282,6 +406,18 @@ def generate_bank_transactions_from_docs(doc_headers):
         }
         return txn
 
+    # Settlement currency (may differ from the invoiced currency)
+    def settlement_currency(doc_currency):
+        rate = CONFIG["cross_currency_settlement_rate"]
+        if fx_table is None or rate <= 0 or random.random() >= rate:
+            return doc_currency
+        return random.choice([c for c in CONFIG["currency_list"] if c != doc_currency])
+
+    def settle_amount(amount, doc_currency, currency, date):
+        if fx_table is None:
+            return amount
+        return fx_convert(fx_table, amount, doc_currency, currency, date)
+
     # Multi-to-one: several invoices paid by single bank transaction
     multi_to_one_groups = []
     all_docs_for_multi = list(chosen_for_multi_to_one)
@@ -295,14 +431,19 @@ def generate_bank_transactions_from_docs(doc_headers):
         multi_to_one_groups.append(group)
 
     for group in multi_to_one_groups:
-        total_amount = sum(doc_lookup[d]["total_amount"] for d in group)
         doc_example = doc_lookup[group[0]]
         pay_date = datetime.strptime(doc_example["issue_date"], "%Y-%m-%d") + timedelta(
             days=random.randint(0, 45)
         )
-        currency = doc_example["currency"]
+        currency = settlement_currency(doc_example["currency"])
+        total_amount = sum(
+            settle_amount(
+                doc_lookup[d]["total_amount"], doc_lookup[d]["currency"], currency, pay_date
+            )
+            for d in group
+        )
 
-        # Add some FX/fee noise
+        # Add some fee noise (FX handled by the rate table when available)
         bank_amount = amount_with_small_noise(total_amount, max_pct=0.05)
         bank_txn = create_bank_txn(bank_amount, pay_date, currency, group)
         bank_txns.append(bank_txn)
@@ -323,6 +464,7 @@ def generate_bank_transactions_from_docs(doc_headers):
         n_parts = random.randint(2, 4)
         remaining = total
         pay_date = datetime.strptime(header["issue_date"], "%Y-%m-%d")
+        currency = settlement_currency(header["currency"])
 
         parts = []
         for i in range(1, n_parts + 1):
@@ -337,9 +479,11 @@ def generate_bank_transactions_from_docs(doc_headers):
         for part in parts:
             txn_date = pay_date + timedelta(days=random.randint(0, 60))
             bank_txn = create_bank_txn(
-                amount_with_small_noise(part, max_pct=0.03),
+                amount_with_small_noise(
+                    settle_amount(part, header["currency"], currency, txn_date), max_pct=0.03
+                ),
                 txn_date,
-                header["currency"],
+                currency,
                 [doc_id],
             )
             bank_txns.append(bank_txn)
@@ -373,6 +517,9 @@ def generate_bank_transactions_from_docs(doc_headers):
             days=random.randint(0, 60)
         )
 
+        currency = settlement_currency(header["currency"])
+        amount = settle_amount(amount, header["currency"], currency, date)
+
         if random.random() < prob_partial:
             bank_amount = amount_with_small_noise(amount, max_pct=0.15)
             link_type = "partial_or_mismatch"
@@ -380,7 +527,7 @@ def generate_bank_transactions_from_docs(doc_headers):
             bank_amount = amount
             link_type = "exact"
 
-        bank_txn = create_bank_txn(bank_amount, date, header["currency"], [doc_id])
+        bank_txn = create_bank_txn(bank_amount, date, currency, [doc_id])
         bank_txns.append(bank_txn)
         reconc_links.append(
             {"doc_id": doc_id, "bank_txn_id": bank_txn["bank_txn_id"], "link_type": link_type}
@@ -540,6 +687,7 @@ def build_missing_items_report(doc_headers, bank_df, reconc_links):
     - docs missing in bank
     - suspicious partial matches
     - bank-only txns without docs
+    currency is the document currency; bank_currency is the settlement currency.
     """
     doc_lookup = {h["doc_id"]: h for h in doc_headers}
     bank_lookup = {r["bank_txn_id"]: r for _, r in bank_df.iterrows()}
@@ -562,12 +710,14 @@ def build_missing_items_report(doc_headers, bank_df, reconc_links):
                     "doc_amount": header["total_amount"],
                     "bank_amount": "",
                     "currency": header["currency"],
+                    "bank_currency": "",
                     "detail": "Document not found in bank statement (likely unpaid or missing).",
                 }
             )
         elif link_type in ["partial_or_mismatch", "one_to_multi", "multi_to_one"]:
             bank_row = bank_lookup.get(bank_id)
             bank_amt = bank_row["amount"] if bank_row is not None else ""
+            bank_ccy = bank_row["currency"] if bank_row is not None else ""
             rows.append(
                 {
                     "issue": "POTENTIAL_MISMATCH",
@@ -576,6 +726,7 @@ def build_missing_items_report(doc_headers, bank_df, reconc_links):
                     "doc_amount": header["total_amount"],
                     "bank_amount": bank_amt,
                     "currency": header["currency"],
+                    "bank_currency": bank_ccy,
                     "detail": f"Mismatched or complex mapping ({link_type}). Requires manual review.",
                 }
             )
@@ -592,6 +743,7 @@ def build_missing_items_report(doc_headers, bank_df, reconc_links):
                     "doc_amount": "",
                     "bank_amount": row["amount"],
                     "currency": row["currency"],
+                    "bank_currency": row["currency"],
                     "detail": "Bank transaction has no matching invoice/receipt.",
                 }
             )
@@ -623,6 +775,219 @@ def build_many_to_one_cases(reconc_links):
     return pd.DataFrame(rows)
 
 
+# ==========================
+# OUTPUT WRITERS
+# ==========================
+
+COMPRESSION_SUFFIXES = {None: "", "gzip": ".gz", "zstd": ".zst"}
+
+
+class _CountingTextSink:
+    """Text sink for to_csv: encodes, counts raw bytes, forwards to a binary stream."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.raw_bytes = 0
+
+    def write(self, text):
+        data = text.encode("utf-8")
+        self.raw_bytes += len(data)
+        self.stream.write(data)
+        return len(text)
+
+
+def check_output_compression(compression):
+    """Fail fast on an unsupported codec or a missing zstandard install."""
+    if compression not in COMPRESSION_SUFFIXES:
+        raise ValueError(
+            f"Unsupported output_compression: {compression!r} "
+            f"(expected one of {list(COMPRESSION_SUFFIXES)})"
+        )
+    if compression == "zstd" and zstandard is None:
+        raise SystemExit("Please install zstandard for zstd output: pip install zstandard")
+
+
+def open_compressed(path, compression, level):
+    if compression is None:
+        return open(path, "wb")
+    if compression == "gzip":
+        return gzip.open(path, "wb", compresslevel=level)
+    raw = open(path, "wb")
+    return zstandard.ZstdCompressor(level=level).stream_writer(raw, closefd=True)
+
+
+def write_table(df, path, compression=None, level=6):
+    """
+    Stream a DataFrame to CSV through the compressor in row chunks.
+    Returns per-file stats: rows, raw CSV bytes, bytes on disk and compression ratio.
+    Copies of the same table left by an earlier run under another codec are removed.
+    """
+    check_output_compression(compression)
+    base, path = path, path + COMPRESSION_SUFFIXES[compression]
+    for suffix in COMPRESSION_SUFFIXES.values():
+        if base + suffix != path and os.path.exists(base + suffix):
+            os.remove(base + suffix)
+    with open_compressed(path, compression, level) as stream:
+        sink = _CountingTextSink(stream)
+        df.to_csv(sink, index=False, chunksize=CONFIG["output_chunk_rows"])
+    bytes_written = os.path.getsize(path)
+    return {
+        "path": path,
+        "rows": len(df),
+        "raw_bytes": sink.raw_bytes,
+        "bytes_written": bytes_written,
+        "compression_ratio": round(sink.raw_bytes / bytes_written, 2) if bytes_written else 0.0,
+    }
+
+
+def submit_table(writer, pending, df, path):
+    """Queue a table on the background writer; df must not be mutated afterwards."""
+    pending.append(
+        writer.submit(
+            write_table,
+            df,
+            path,
+            CONFIG["output_compression"],
+            CONFIG["output_compression_level"],
+        )
+    )
+
+
+def report_output_stats(stats):
+    print(f"{'file':<60} {'rows':>9} {'raw':>12} {'written':>12} {'ratio':>6}")
+    for st in stats:
+        print(
+            f"{st['path']:<60} {st['rows']:>9} {st['raw_bytes']:>12} "
+            f"{st['bytes_written']:>12} {st['compression_ratio']:>6}"
+        )
+    total_raw = sum(st["raw_bytes"] for st in stats)
+    total_written = sum(st["bytes_written"] for st in stats)
+    ratio = round(total_raw / total_written, 2) if total_written else 0.0
+    print(f"{'TOTAL':<60} {'':>9} {total_raw:>12} {total_written:>12} {ratio:>6}")
+
+
+# ==========================
+# PARTITIONED OUTPUT
+# ==========================
+
+# table -> (partition date column, amount column summarized in the manifest)
+PARTITION_SPECS = {
+    "invoices_header": ("issue_date", "total_amount"),
+    "invoices_line_items": ("issue_date", "line_amount"),
+    "receipts_header": ("issue_date", "total_amount"),
+    "receipts_line_items": ("issue_date", "line_amount"),
+    "bank_statement": ("booking_date", "amount"),
+    "ground_truth_links": ("link_date", None),
+}
+
+
+def partition_key_name(date_col, granularity):
+    if granularity == "day":
+        return date_col
+    if granularity == "month":
+        return date_col.replace("_date", "_month")
+    raise ValueError(f"Unsupported output_partitioning: {granularity!r}")
+
+
+def submit_partitioned_table(writer, pending, df, table, dates, currencies, part_root):
+    """
+    Split a table into Hive-style directories and queue one file per partition:
+    <table>/<date_key>=<YYYY-MM-DD or YYYY-MM>/currency=<CCY>/part-00000.csv[.gz|.zst]
+    Line items and links get the inherited date column so rows filter exactly.
+    Partitions from earlier runs are removed first.
+    Returns manifest rows (sizes are filled in once the writers finish).
+    """
+    date_col, amount_col = PARTITION_SPECS[table]
+    granularity = CONFIG["output_partitioning"]
+    key = partition_key_name(date_col, granularity)
+    dates = pd.to_datetime(pd.Series(dates, index=df.index))
+    values = dates.dt.strftime("%Y-%m-%d" if granularity == "day" else "%Y-%m")
+    currencies = pd.Series(currencies, index=df.index)
+    if date_col not in df.columns:
+        df = df.assign(**{date_col: dates.dt.strftime("%Y-%m-%d")})
+
+    shutil.rmtree(os.path.join(part_root, table), ignore_errors=True)
+
+    manifest = []
+    for (value, ccy), part in df.groupby([values.rename(key), currencies.rename("currency")]):
+        rel_dir = os.path.join(table, f"{key}={value}", f"currency={ccy}")
+        os.makedirs(os.path.join(part_root, rel_dir), exist_ok=True)
+        file_name = "part-00000.csv"
+        submit_table(writer, pending, part, os.path.join(part_root, rel_dir, file_name))
+
+        part_dates = dates.loc[part.index]
+        manifest.append(
+            {
+                "table": table,
+                "date_column": date_col,
+                "partition_key": key,
+                "partition_value": value,
+                "currency": ccy,
+                "path": os.path.join(
+                    rel_dir, file_name + COMPRESSION_SUFFIXES[CONFIG["output_compression"]]
+                ),
+                "rows": len(part),
+                "date_min": part_dates.min().strftime("%Y-%m-%d"),
+                "date_max": part_dates.max().strftime("%Y-%m-%d"),
+                "min_amount": part[amount_col].min() if amount_col else None,
+                "max_amount": part[amount_col].max() if amount_col else None,
+            }
+        )
+    return manifest
+
+
+def submit_dataset_table(writer, pending, manifest, df, table, out_dir, dates, currencies):
+    """Flat <table>.csv by default, date/currency partitions when output_partitioning is set."""
+    if CONFIG["output_partitioning"]:
+        part_root = os.path.join(CONFIG["root_output_dir"], "output", "partitioned")
+        manifest.extend(
+            submit_partitioned_table(writer, pending, df, table, dates, currencies, part_root)
+        )
+    else:
+        submit_table(writer, pending, df, os.path.join(out_dir, f"{table}.csv"))
+
+
+def write_partition_manifest(manifest, output_stats):
+    """Uncompressed _manifest.csv so readers can prune without opening partition files."""
+    part_root = os.path.join(CONFIG["root_output_dir"], "output", "partitioned")
+    sizes = {
+        os.path.relpath(st["path"], part_root): st["bytes_written"] for st in output_stats
+    }
+    manifest_df = pd.DataFrame(manifest)
+    manifest_df["bytes_written"] = manifest_df["path"].map(sizes)
+    manifest_df.to_csv(os.path.join(part_root, "_manifest.csv"), index=False)
+
+
+def collapse_partition_stats(output_stats):
+    """One report line per partitioned table instead of one per partition file."""
+    part_root = os.path.join(CONFIG["root_output_dir"], "output", "partitioned")
+    collapsed = {}
+    stats = []
+    for st in output_stats:
+        rel = os.path.relpath(st["path"], part_root)
+        if rel.startswith(os.pardir):
+            stats.append(st)
+            continue
+        table = rel.split(os.sep)[0]
+        agg = collapsed.setdefault(
+            table,
+            {
+                "path": os.path.join(part_root, table, "*"),
+                "rows": 0,
+                "raw_bytes": 0,
+                "bytes_written": 0,
+            },
+        )
+        for field in ["rows", "raw_bytes", "bytes_written"]:
+            agg[field] += st[field]
+    for agg in collapsed.values():
+        agg["compression_ratio"] = (
+            round(agg["raw_bytes"] / agg["bytes_written"], 2) if agg["bytes_written"] else 0.0
+        )
+        stats.append(agg)
+    return stats
+
+
 # ==========================
 # METADATA FILES
 # ==========================
@@ -663,7 +1028,10 @@ def write_metadata(root, invoices_header_df, receipts_header_df, bank_df):
         f.write("# Generation Notes\n\n")
         f.write("- Synthetic invoices/receipts generated using Faker, lognormal and exponential distributions.\n")
         f.write("- Bank transactions created with complex mapping patterns: exact, partial, one-to-many, many-to-one, and missing.\n")
+        f.write("- Daily FX rates (output/fx/fx_rates.csv*) follow a random walk; *_reporting columns hold amounts in the reporting currency.\n")
         f.write("- OCR JSON adds noise: dropped fields, typos, and random bounding boxes to approximate real scanned documents.\n")
+        f.write("- Tables are written by background threads, compressed per output_compression (.gz/.zst suffix).\n")
+        f.write("- With output_partitioning, headers, line items, bank transactions and links are split into <date_key>=<value>/currency=<CCY>/ directories under output/partitioned, indexed by _manifest.csv.\n")
         f.write("- See the script for parameters controlling volumes and noise rates.\n")
 
 
@@ -673,6 +1041,7 @@ def write_metadata(root, invoices_header_df, receipts_header_df, bank_df):
 
 def main():
     root = CONFIG["root_output_dir"]
+    check_output_compression(CONFIG["output_compression"])
     ensure_dirs(root)
 
     # Master data
@@ -688,52 +1057,140 @@ def main():
     rct_headers_df = pd.DataFrame(rct_headers)
     rct_lines_df = pd.DataFrame(rct_lines)
 
-    # Bank transactions from all docs
-    all_doc_headers = inv_headers + rct_headers
-    bank_txns, reconc_links = generate_bank_transactions_from_docs(all_doc_headers)
-    bank_df = pd.DataFrame(bank_txns)
-    reconc_links_df = pd.DataFrame(reconc_links)
+    # Background writers: each table is written as soon as it is final
+    inv_dir = os.path.join(root, "output", "invoices")
+    bank_dir = os.path.join(root, "output", "bank")
+    fx_dir = os.path.join(root, "output", "fx")
+    recon_dir = os.path.join(root, "output", "reconciliation")
+    writer = ThreadPoolExecutor(max_workers=CONFIG["output_writer_threads"])
+    pending = []
+    partition_manifest = []
+
+    try:
+        # Daily FX rates covering issue dates through the latest possible payment date
+        fx_start = (datetime.now() - timedelta(days=CONFIG["date_range_days"])).date()
+        fx_table = generate_fx_table(
+            CONFIG["currency_list"],
+            fx_start,
+            CONFIG["date_range_days"] + CONFIG["fx_horizon_days"] + 1,
+        )
+        submit_table(
+            writer, pending, fx_table_to_df(fx_table), os.path.join(fx_dir, "fx_rates.csv")
+        )
 
-    # OCR JSON dumps per doc
-    ocr_dir = os.path.join(root, "output", "invoices", "ocr_noise")
-    # To keep generation time reasonable, you can subsample here if needed
-    per_doc_lines = defaultdict(list)
-    for li in inv_lines + rct_lines:
-        per_doc_lines[li["doc_id"]].append(li)
+        # Amounts normalized to the reporting currency
+        normalize_to_reporting(inv_headers_df, "total_amount", "currency", "issue_date", fx_table)
+        normalize_to_reporting(rct_headers_df, "total_amount", "currency", "issue_date", fx_table)
+
+        # Line items and links inherit issue date and currency from their document
+        doc_info = pd.concat([inv_headers_df, rct_headers_df]).set_index("doc_id")
+        doc_dates, doc_currencies = doc_info["issue_date"], doc_info["currency"]
+
+        for table, headers_df, lines_df in [
+            ("invoices", inv_headers_df, inv_lines_df),
+            ("receipts", rct_headers_df, rct_lines_df),
+        ]:
+            submit_dataset_table(
+                writer,
+                pending,
+                partition_manifest,
+                headers_df,
+                f"{table}_header",
+                inv_dir,
+                headers_df["issue_date"],
+                headers_df["currency"],
+            )
+            submit_dataset_table(
+                writer,
+                pending,
+                partition_manifest,
+                lines_df,
+                f"{table}_line_items",
+                inv_dir,
+                lines_df["doc_id"].map(doc_dates),
+                lines_df["doc_id"].map(doc_currencies),
+            )
 
-    for header in all_doc_headers:
-        doc_id = header["doc_id"]
-        ocr_path = os.path.join(ocr_dir, f"{doc_id}.json")
-        generate_ocr_json_for_doc(header, per_doc_lines[doc_id], ocr_path)
+        # Bank transactions from all docs
+        all_doc_headers = inv_headers + rct_headers
+        bank_txns, reconc_links = generate_bank_transactions_from_docs(all_doc_headers, fx_table)
+        bank_df = pd.DataFrame(bank_txns)
+        reconc_links_df = pd.DataFrame(reconc_links)
+        normalize_to_reporting(bank_df, "amount", "currency", "booking_date", fx_table)
+
+        submit_dataset_table(
+            writer,
+            pending,
+            partition_manifest,
+            bank_df,
+            "bank_statement",
+            bank_dir,
+            bank_df["booking_date"],
+            bank_df["currency"],
+        )
 
-    # Messy bank statement variant
-    bank_messy_df = create_messy_bank_statement(bank_df)
+        # Links are dated by bank booking date, or the issue date when missing in bank
+        bank_dates = bank_df.set_index("bank_txn_id")["booking_date"]
+        link_dates = reconc_links_df["bank_txn_id"].map(bank_dates)
+        link_dates = link_dates.fillna(reconc_links_df["doc_id"].map(doc_dates))
+        submit_dataset_table(
+            writer,
+            pending,
+            partition_manifest,
+            reconc_links_df,
+            "ground_truth_links",
+            recon_dir,
+            link_dates,
+            reconc_links_df["doc_id"].map(doc_currencies),
+        )
 
-    # Reconciliation reports
-    missing_report_df = build_missing_items_report(all_doc_headers, bank_df, reconc_links)
-    many_to_one_cases_df = build_many_to_one_cases(reconc_links)
+        # OCR JSON dumps per doc
+        ocr_dir = os.path.join(root, "output", "invoices", "ocr_noise")
+        # To keep generation time reasonable, you can subsample here if needed
+        per_doc_lines = defaultdict(list)
+        for li in inv_lines + rct_lines:
+            per_doc_lines[li["doc_id"]].append(li)
+
+        for header in all_doc_headers:
+            doc_id = header["doc_id"]
+            ocr_path = os.path.join(ocr_dir, f"{doc_id}.json")
+            generate_ocr_json_for_doc(header, per_doc_lines[doc_id], ocr_path)
+
+        # Messy bank statement variant
+        bank_messy_df = create_messy_bank_statement(bank_df)
+        submit_table(
+            writer, pending, bank_messy_df, os.path.join(bank_dir, "bank_statement_messy.csv")
+        )
 
-    # Write CSVs
-    inv_dir = os.path.join(root, "output", "invoices")
-    bank_dir = os.path.join(root, "output", "bank")
-    recon_dir = os.path.join(root, "output", "reconciliation")
+        # Reconciliation reports
+        missing_report_df = build_missing_items_report(all_doc_headers, bank_df, reconc_links)
+        many_to_one_cases_df = build_many_to_one_cases(reconc_links)
 
-    inv_headers_df.to_csv(os.path.join(inv_dir, "invoices_header.csv"), index=False)
-    inv_lines_df.to_csv(os.path.join(inv_dir, "invoices_line_items.csv"), index=False)
-    rct_headers_df.to_csv(os.path.join(inv_dir, "receipts_header.csv"), index=False)
-    rct_lines_df.to_csv(os.path.join(inv_dir, "receipts_line_items.csv"), index=False)
+        submit_table(
+            writer,
+            pending,
+            missing_report_df,
+            os.path.join(recon_dir, "missing_items_report.csv"),
+        )
+        submit_table(
+            writer,
+            pending,
+            many_to_one_cases_df,
+            os.path.join(recon_dir, "many_to_one_mapping_cases.csv"),
+        )
 
-    bank_df.to_csv(os.path.join(bank_dir, "bank_statement.csv"), index=False)
-    bank_messy_df.to_csv(os.path.join(bank_dir, "bank_statement_messy.csv"), index=False)
+        # Metadata
+        write_metadata(root, inv_headers_df, rct_headers_df, bank_df)
 
-    reconc_links_df.to_csv(os.path.join(recon_dir, "ground_truth_links.csv"), index=False)
-    missing_report_df.to_csv(os.path.join(recon_dir, "missing_items_report.csv"), index=False)
-    many_to_one_cases_df.to_csv(
-        os.path.join(recon_dir, "many_to_one_mapping_cases.csv"), index=False
-    )
+        # Wait for background writers
+        output_stats = [f.result() for f in pending]
+    finally:
+        writer.shutdown(cancel_futures=True)
 
-    # Metadata
-    write_metadata(root, inv_headers_df, rct_headers_df, bank_df)
+    if partition_manifest:
+        write_partition_manifest(partition_manifest, output_stats)
+        output_stats = collapse_partition_stats(output_stats)
+    report_output_stats(output_stats)
 
     print(f"Synthetic dataset generated under: {os.path.abspath(root)}")
 